@@ -1,11 +1,36 @@
-import random
+import math
+import os
 import statistics
-from typing import Set, List, Optional
-import matplotlib.pyplot as plt
-import matplotlib.ticker as mticker
+from bisect import bisect_left
+from functools import reduce
+from itertools import accumulate
+from multiprocessing import Pool
+from operator import or_
+from typing import Dict, Iterable, List, Optional, Tuple
 import numpy as np
 
 
+# ==============================================================================
+# Mod Sets as Bitmasks
+# ==============================================================================
+# Mods are numbered 0..n-1, so a set of mods is stored as a single int with bit i
+# set iff mod i is in the set: union is `|`, difference is `& ~` and
+# "a is a subset of b" is `a & ~b == 0`, all evaluated in C on a few machine words.
+Mask = int
+
+def _to_mask(mods: Iterable[int]) -> Mask:
+    """Builds the bitmask of the given mod numbers."""
+    return reduce(or_, (1 << m for m in mods), 0)
+
+def _mask_to_list(mask: Mask) -> List[int]:
+    """Returns the mod numbers contained in a bitmask in ascending order."""
+    mods = []
+    while mask:
+        low_bit = mask & -mask
+        mods.append(low_bit.bit_length() - 1)
+        mask ^= low_bit
+    return mods
+
 # ==============================================================================
 # The "Oracle" - Simulates the expensive test (e.g., launching Minecraft)
 # ==============================================================================
@@ -14,71 +39,104 @@ class TestRunner:
     A deterministic test oracle that knows the secret problematic set.
     It returns True (FAIL) if the test_set is a superset of the secret set.
     It also counts how many times it has been called.
+
+    Results are memoized per test set. `test_count` still counts every test an
+    algorithm asks for (the benchmark metric), while `real_test_count` and
+    `cached_hit_count` split that into evaluated tests and cache hits.
+    Oracles for the same problematic set may share one `shared_cache`.
     """
-    def __init__(self, problematic_set: Set[int]):
-        self._problematic_set = problematic_set
+    def __init__(self, problematic_mask: Mask, shared_cache: Optional[Dict[Mask, bool]] = None):
+        self._problematic_mask = problematic_mask
+        self._cache: Dict[Mask, bool] = shared_cache if shared_cache is not None else {}
         self.test_count = 0
+        self.real_test_count = 0
+        self.cached_hit_count = 0
 
-    def run(self, test_set: Set[int]) -> bool:
+    def run(self, test_set: Mask) -> bool:
         """Runs the test. Returns True for FAIL (F), False for GOOD (G)."""
         self.test_count += 1
-        return self._problematic_set.issubset(test_set)
+        result = self._cache.get(test_set)
+        if result is not None:
+            self.cached_hit_count += 1
+            return result
+
+        self.real_test_count += 1
+        result = (self._problematic_mask & ~test_set) == 0
+        self._cache[test_set] = result
+        return result
+
+# ==============================================================================
+# Shared by the Additive Searches (Algorithms 1 and 2)
+# ==============================================================================
+# Below this many candidates the divide-and-conquer helpers probe each candidate in turn:
+# that needs no partition masks, and it skips the final confirmation test of binary search.
+LINEAR_SCAN_THRESHOLD = 3
 
 # ==============================================================================
 # Algorithm 1: Iterative Additive Search
 # ==============================================================================
 
-def _find_one_culprit_recursive(
+def _find_one_culprit(
     oracle: TestRunner,
-    base_set: Set[int],
+    base_set: Mask,
     search_pool: List[int]
 ) -> Optional[int]:
     """
-    Recursively binary-searches the search_pool to find the *single* mod
+    Binary-searches the search_pool to find the *single* mod
     that, when added to base_set, causes a failure.
+    The search narrows a (lo, hi) index range over search_pool in a loop
+    instead of recursing on copied halves.
     """
     if not search_pool:
         return None
-        
-    if len(search_pool) == 1:
-        # Final check if the single item is the culprit
-        if oracle.run(base_set.union(search_pool)):
-            return search_pool[0]
-        else:
-            return None
 
-    mid = len(search_pool) // 2
-    first_half = search_pool[:mid]
-    second_half = search_pool[mid:]
+    run = oracle.run # Bound once; the loop below is the benchmark's hottest path
+    background = base_set
+    lo, hi = 0, len(search_pool)
+    while hi - lo > LINEAR_SCAN_THRESHOLD:
+        mid = lo + (hi - lo) // 2
+        first_half = _to_mask(search_pool[lo:mid])
 
-    # Test the first half combined with the base set
-    if oracle.run(base_set.union(first_half)):
-        return _find_one_culprit_recursive(oracle, base_set, first_half)
-    else:
-        # The first half is "good", so add it to the base set for the next check
-        return _find_one_culprit_recursive(oracle, base_set.union(first_half), second_half)
+        # Test the first half combined with the background
+        if run(background | first_half):
+            hi = mid
+        else:
+            # The first half is "good", so add it to the background for the next check
+            background |= first_half
+            lo = mid
 
+    # Probe the last few items one by one; each good one joins the background.
+    for culprit in search_pool[lo:hi]:
+        culprit_bit = 1 << culprit
+        if run(background | culprit_bit):
+            return culprit
+        background |= culprit_bit
+    return None
 
-def find_conflicts_additive(oracle: TestRunner, all_mods: List[int]) -> Set[int]:
+
+def find_conflicts_additive(oracle: TestRunner, all_mods: List[int]) -> Mask:
     """
     Finds the minimal failing set by iteratively finding one culprit at a time.
     """
-    if not oracle.run(set(all_mods)):
-        return set()
+    if not oracle.run(_to_mask(all_mods)):
+        return 0
 
-    confirmed_culprits: Set[int] = set()
-    candidates = list(all_mods)
+    confirmed_culprits: Mask = 0
+    candidates = sorted(all_mods) # Kept sorted so culprits are removed via bisect
 
+    # This probe is what ends the search: once the confirmed culprits fail on their own,
+    # every test in _find_one_culprit fails too and it would return an innocent
+    # first candidate rather than None, so it cannot be folded into the helper's result.
     while not oracle.run(confirmed_culprits):
-        next_culprit = _find_one_culprit_recursive(
+        next_culprit = _find_one_culprit(
             oracle,
             base_set=confirmed_culprits,
             search_pool=candidates
         )
         
         if next_culprit is not None:
-            confirmed_culprits.add(next_culprit)
-            candidates.remove(next_culprit)
+            confirmed_culprits |= 1 << next_culprit
+            del candidates[bisect_left(candidates, next_culprit)]
         else:
             raise RuntimeError("Additive search failed to find the next culprit.")
 
@@ -90,74 +148,75 @@ def find_conflicts_additive(oracle: TestRunner, all_mods: List[int]) -> Set[int]
 # ==============================================================================
 
 
-def _find_next_conflict_element_optimized(oracle: TestRunner, background: Set[str], candidates: List[str]) -> Optional[str]:
-    # Ensure candidates are sorted for deterministic splitting
-    candidates_list = sorted(list(candidates)) 
+def _prefix_masks(sorted_mods: List[int]) -> List[Mask]:
+    """
+    Builds the prefix-OR table P of a sorted candidate list, where P[k] is the mask
+    of the first k candidates. The candidates in [lo, hi) are then `P[hi] ^ P[lo]`
+    (the prefixes are nested, so XOR is the same as AND-NOT).
+    """
+    return list(accumulate((1 << m for m in sorted_mods), or_, initial=0))
+
+def _find_next_conflict_element_optimized(oracle: TestRunner, background: Mask, prefix: List[Mask], lo: int, hi: int) -> Optional[int]:
+    # The candidates are the sorted range [lo, hi) of the prefix table, so every
+    # partition mask is a single XOR and splitting stays deterministic.
+    # Returns the index of the found element in the sorted candidate list.
 
     # Base Case 1: No more candidates to test.
-    if not candidates_list:
+    if lo >= hi:
         return None
     
-    # Base Case 2: Only one candidate left. Handles initial call if C_all has size 1.
-    if len(candidates_list) == 1:
-        c = candidates_list[0]
-        if oracle.run(background.union({c})):
-            return c
-        else:
-            return None
+    # Base Case 2: Only a few candidates left, probe them one by one. Handles initial call if C_all is small.
+    if hi - lo <= LINEAR_SCAN_THRESHOLD:
+        for index in range(lo, hi):
+            c = prefix[index + 1] ^ prefix[index]
+            if oracle.run(background | c):
+                return index
+            background |= c
+        return None
 
-    # Recursive Step: Divide and conquer.
-    mid = len(candidates_list) // 2
-    c1 = set(candidates_list[:mid])
-    c2 = set(candidates_list[mid:])
+    # Recursive Step: Divide and conquer. Both halves hold at least two candidates here,
+    # since smaller ranges are scanned linearly above.
+    mid = lo + (hi - lo) // 2
+    c1 = prefix[mid] ^ prefix[lo]
 
     # Test the first half.
-    if oracle.run(background.union(c1)):
-        # OPTIMIZATION: The conflict is in C1. If C1 is a single element, we are done.
-        if len(c1) == 1:
-            return list(c1)[0]
-        else:
-            # Recursive call
-            return _find_next_conflict_element_optimized(oracle, background, list(c1))
+    if oracle.run(background | c1):
+        return _find_next_conflict_element_optimized(oracle, background, prefix, lo, mid)
     
     # Otherwise, the first half is "safe." Search the second half.
     else:
-        new_background = background.union(c1)
-        # OPTIMIZATION: The conflict might be in C2. If C2 is a single element, test it directly.
-        if len(c2) == 1:
-            d = list(c2)[0]
-            if oracle.run(new_background.union({d})):
-                return d
-            else:
-                return None
-        else:
-            # Recursive call
-            return _find_next_conflict_element_optimized(oracle, new_background, list(c2))
+        return _find_next_conflict_element_optimized(oracle, background | c1, prefix, mid, hi)
 
-def find_conflicts_smart_additive(oracle: TestRunner, all_mods: List[int]) -> Set[int]:
+def find_conflicts_smart_additive(oracle: TestRunner, all_mods: List[int]) -> Mask:
     """
     The Iterative Minimal Conflict Search (IMCS) algorithm.
     """
-    conflict_set: Set[str] = set()
-    candidates: List[str] = sorted(all_mods) # Ensure initial candidates are sorted
+    conflict_set: Mask = 0
+    candidates: List[int] = sorted(all_mods) # Sorted once; removals keep the order
+    prefix = _prefix_masks(candidates)
 
     while True:
         # Find the next single component that, in conjunction with the current conflict_set, 
         # contributes to the failure
-        next_element = _find_next_conflict_element_optimized(oracle, conflict_set, candidates)
+        index = _find_next_conflict_element_optimized(oracle, conflict_set, prefix, 0, len(candidates))
         
-        if next_element is None:
+        if index is None:
             # If no additional conflict element can be found, the process is complete.
             break
         
         # Add the found element to the confirmed conflict_set and remove it from candidates.
-        conflict_set.add(next_element)
-        candidates.remove(next_element)
+        next_element = candidates.pop(index)
+        conflict_set |= 1 << next_element
         
         # Optimization: Test if the current conflict_set is already a complete, minimal set.
         # If it causes failure, we can terminate early.
         if oracle.run(conflict_set):
             break
+
+        # Drop the element from the prefix table in place: entries up to the index are
+        # unaffected and every later entry just loses its bit.
+        bit = 1 << next_element
+        prefix[index + 1:] = [m ^ bit for m in prefix[index + 2:]]
             
     return conflict_set
 
@@ -165,28 +224,32 @@ def find_conflicts_smart_additive(oracle: TestRunner, all_mods: List[int]) -> Se
 # Algorithm 3: Classic `ddmin` (Subtractive)
 # ==============================================================================
 
-def find_conflicts_subtractive_ddmin(oracle: TestRunner, all_mods: List[int]) -> Set[int]:
+def find_conflicts_subtractive_ddmin(oracle: TestRunner, all_mods: List[int]) -> Mask:
     """
     Finds the minimal failing set using the classic ddmin algorithm.
     Starts with a failing set and tries to remove pieces.
     """
-    test_set = set(all_mods)
+    test_set = _to_mask(all_mods)
 
     if not oracle.run(test_set):
-        return set()
+        return 0
 
+    run = oracle.run
     granularity = 2
-    while len(test_set) >= 2:
-        mods_list = sorted(list(test_set))
-        partitions = [mods_list[i::granularity] for i in range(granularity)]
-        
+    # The single-mod bits of test_set only change when test_set shrinks, not when
+    # the granularity is refined, so they are rebuilt only on progress.
+    mod_bits = [1 << m for m in _mask_to_list(test_set)]
+    while len(mod_bits) >= 2:
         made_progress = False
         
-        for p in partitions:
+        # Partitions are built lazily; most rounds stop at the first failing complement.
+        for i in range(granularity):
+            p = reduce(or_, mod_bits[i::granularity], 0)
             if not p: continue # Skip empty partitions
-            complement = test_set.difference(p)
-            if oracle.run(complement):
+            complement = test_set ^ p
+            if run(complement):
                 test_set = complement
+                mod_bits = [1 << m for m in _mask_to_list(test_set)]
                 granularity = 2
                 made_progress = True
                 break
@@ -194,8 +257,8 @@ def find_conflicts_subtractive_ddmin(oracle: TestRunner, all_mods: List[int]) ->
         if made_progress:
             continue
 
-        if granularity < len(test_set):
-            granularity = min(len(test_set), granularity * 2)
+        if granularity < len(mod_bits):
+            granularity = min(len(mod_bits), granularity * 2)
         else:
             break
             
@@ -204,134 +267,239 @@ def find_conflicts_subtractive_ddmin(oracle: TestRunner, all_mods: List[int]) ->
 # ==============================================================================
 # Algorithm 4: QuickXplain
 # ==============================================================================
-def _quickxplain_recursive(oracle: TestRunner, background: Set[int], candidates: Set[int]) -> Set[int]:
-    """The recursive core of the QuickXplain algorithm."""
-    # Base Case 1: If C is empty or B already fails, no explanation from C is needed.
-    if not candidates or oracle.run(background):
-        return set()
-    
-    # Base Case 2: If C has a single element, it must be the explanation.
-    if len(candidates) == 1:
-        return candidates
+_QXP_SEARCH, _QXP_REFINE, _QXP_MERGE = range(3)
 
-    # Recursive Step: Divide and Conquer
-    candidate_list = list(candidates)
-    mid = len(candidate_list) // 2
-    c1 = set(candidate_list[:mid])
-    c2 = set(candidate_list[mid:])
+def _quickxplain(oracle: TestRunner, background: Mask, prefix: List[Mask], lo: int, hi: int, bg_known_good: bool = False) -> Mask:
+    """
+    The core of the QuickXplain algorithm, driven by an explicit task stack.
+    A split pushes its pending refine pass below the filter pass; the refine
+    pass reads the filter result (cs2) from the results stack and a merge
+    task combines both, reproducing the recursive test order exactly.
 
-    # Filter Pass: Find conflicts in c2, assuming all of c1 is present.
-    cs2 = _quickxplain_recursive(oracle, background.union(c1), c2)
-    
-    # Refine Pass: Find conflicts in c1, assuming only the essential parts of c2 are present.
-    cs1 = _quickxplain_recursive(oracle, background.union(cs2), c1)
+    Every candidate set QuickXplain visits is a contiguous range [lo, hi) of the
+    sorted candidates, so it is `prefix[hi] ^ prefix[lo]` (see `_prefix_masks`).
 
-    return cs1.union(cs2)
+    As in the original QuickXplain, B is only tested if something was added to it
+    since it was last known to pass: pass `bg_known_good` to skip that test.
+    """
+    run = oracle.run
+    results: List[Mask] = []
+    tasks = [(_QXP_SEARCH, background, lo, hi, bg_known_good)]
+
+    while tasks:
+        kind, bg, lo, hi, known_good = tasks.pop()
+
+        if kind == _QXP_SEARCH:
+            # Base Case 1: If C is empty or B already fails, no explanation from C is needed.
+            if lo >= hi or (not known_good and run(bg)):
+                results.append(0)
+                continue
+
+            # Base Case 2: If C has a single element, it must be the explanation.
+            if hi - lo == 1:
+                results.append(prefix[hi] ^ prefix[lo])
+                continue
+
+            # Divide and Conquer: c1 = [lo, mid), c2 = [mid, hi)
+            mid = lo + (hi - lo) // 2
+            c1 = prefix[mid] ^ prefix[lo]
+
+            # Filter Pass first: find conflicts in c2, assuming all of c1 is present.
+            tasks.append((_QXP_REFINE, bg, lo, mid, False))
+            tasks.append((_QXP_SEARCH, bg | c1, mid, hi, False))
+
+        elif kind == _QXP_REFINE:
+            # Refine Pass: find conflicts in c1, assuming only the essential parts of c2 are present.
+            # B itself passed in the enclosing search, so B | cs2 only needs a test if cs2 is not empty.
+            cs2 = results[-1]
+            tasks.append((_QXP_MERGE, 0, 0, 0, False))
+            tasks.append((_QXP_SEARCH, bg | cs2, lo, hi, not cs2))
+
+        else:
+            cs1 = results.pop()
+            cs2 = results.pop()
+            results.append(cs1 | cs2)
 
-def find_conflicts_qxp(oracle: TestRunner, all_mods: List[int]) -> Set[int]:
+    return results.pop()
+
+def find_conflicts_qxp(oracle: TestRunner, all_mods: List[int]) -> Mask:
     """Finds the minimal failing set using the QuickXplain algorithm."""
+    prefix = _prefix_masks(sorted(all_mods))
     # Initial check: if the full set doesn't fail, there's nothing to find.
-    if not oracle.run(set(all_mods)):
-        return set()
+    if not oracle.run(prefix[-1]):
+        return 0
     
-    return _quickxplain_recursive(oracle, set(), set(all_mods))
+    return _quickxplain(oracle, 0, prefix, 0, len(all_mods))
 
 # ==============================================================================
 # The "Adaptive" Algorithm - The Best of Both Worlds
 # ==============================================================================
 ADAPTIVE_THRESHOLD = 50 # The number of candidates below which we switch to the QXP strategy
 
-def _adaptive_recursive(oracle: TestRunner, background: Set[int], candidates: Set[int]) -> Set[int]:
+def _adaptive_recursive(oracle: TestRunner, background: Mask, candidates: Mask) -> Mask:
     """The recursive core of the Adaptive algorithm."""
-    # Base Case 1: If C is empty or B already fails, no explanation from C is needed.
-    if not candidates or oracle.run(background):
-        return set()
-    
-    # --- The Adaptive Strategy Switch ---
-    if len(candidates) <= ADAPTIVE_THRESHOLD:
-        # STRATEGY 1: For small, dense sets, use the powerful QuickXplain logic.
-        if len(candidates) == 1: return candidates # QXP Base Case
-        candidate_list = list(candidates)
-        mid = len(candidate_list) // 2
-        c1, c2 = set(candidate_list[:mid]), set(candidate_list[mid:])
-        cs2 = _adaptive_recursive(oracle, background.union(c1), c2)
-        cs1 = _adaptive_recursive(oracle, background.union(cs2), c1)
-        return cs1.union(cs2)
-    else:
-        # STRATEGY 2: For large, sparse sets, use the lean Smart Additive logic.
+    found: Mask = 0
+    search_pool: Optional[List[int]] = None
+
+    # STRATEGY 2: For large, sparse sets, use the lean Smart Additive logic.
+    # Each found culprit moves into the background; this loop replaces the tail
+    # recursion on the remaining candidates, so we only recurse for QuickXplain.
+    while True:
+        # Base Case 1: If C is empty or B already fails, no explanation from C is needed.
+        if not candidates or oracle.run(background):
+            return found
+
+        # --- The Adaptive Strategy Switch ---
+        if candidates.bit_count() <= ADAPTIVE_THRESHOLD:
+            break
+
         # Find just one culprit from the current candidates.
-        next_culprit = _find_one_culprit_recursive(oracle, background, list(candidates))
-        
+        if search_pool is None:
+            search_pool = _mask_to_list(candidates)
+        next_culprit = _find_one_culprit(oracle, background, search_pool)
+
         if next_culprit is None:
-            return set() # No single culprit found, means no culprits are in C given B
-        
-        # We found one. The final conflict set is this culprit plus whatever is found
-        # by recursively searching the rest of the candidates.
-        remaining_candidates = candidates - {next_culprit}
-        return {next_culprit}.union(_adaptive_recursive(oracle, background.union({next_culprit}), remaining_candidates))
+            return found # No single culprit found, means no culprits are in C given B
+
+        culprit_bit = 1 << next_culprit
+        found |= culprit_bit
+        candidates &= ~culprit_bit
+        background |= culprit_bit
+        del search_pool[bisect_left(search_pool, next_culprit)]
+
+    # STRATEGY 1: For small, dense sets, use the powerful QuickXplain logic.
+    if candidates.bit_count() == 1: return found | candidates # QXP Base Case
+    candidate_list = _mask_to_list(candidates)
+    mid = len(candidate_list) // 2
+    c1 = _to_mask(candidate_list[:mid])
+    c2 = candidates & ~c1
+    cs2 = _adaptive_recursive(oracle, background | c1, c2)
+    cs1 = _adaptive_recursive(oracle, background | cs2, c1)
+    return found | cs1 | cs2
 
 
-def find_conflicts_adaptive(oracle: TestRunner, all_mods: List[int]) -> Set[int]:
+def find_conflicts_adaptive(oracle: TestRunner, all_mods: List[int]) -> Mask:
     """Finds the minimal failing set using a hybrid of Smart Additive and QuickXplain logic."""
-    if not oracle.run(set(all_mods)):
-        return set()
-    return _adaptive_recursive(oracle, set(), set(all_mods))
+    all_mask = _to_mask(all_mods)
+    if not oracle.run(all_mask):
+        return 0
+    return _adaptive_recursive(oracle, 0, all_mask)
 
 # ==============================================================================
 # Benchmarking and Plotting Harness
 # ==============================================================================
-def run_benchmark_and_plot():
-    if not plt or not np:
-        print("Matplotlib and/or numpy not found. Cannot generate plots.")
-        return
+ALGORITHMS = {
+    "Original Additive": find_conflicts_additive,
+    "Smart Additive": find_conflicts_smart_additive,
+    "ddmin Subtractive": find_conflicts_subtractive_ddmin,
+    "QuickXplain": find_conflicts_qxp,
+    "Adaptive Hybrid": find_conflicts_adaptive
+}
+
+# Sequential sampling: an algorithm stops drawing trials for a config once the 95% confidence
+# interval of its mean test count is narrower than EARLY_STOP_REL_CI of the mean.
+EARLY_STOP_MIN_TRIALS = 30
+EARLY_STOP_CHECK_EVERY = 10
+EARLY_STOP_REL_CI = 0.05
+
+def _mean_has_converged(num_trials: int, total: int, total_sq: int) -> bool:
+    """Checks the early-stopping rule from the running count, sum and sum of squares."""
+    if num_trials < EARLY_STOP_MIN_TRIALS or num_trials % EARLY_STOP_CHECK_EVERY != 0:
+        return False
+    mean = total / num_trials
+    variance = max(total_sq - total * mean, 0) / (num_trials - 1)
+    ci_halfwidth = 1.96 * math.sqrt(variance / num_trials)
+    return ci_halfwidth < EARLY_STOP_REL_CI * mean
+
+def _run_config(args: Tuple[int, int, int, int, int]) -> Tuple[int, int, Dict[str, List[int]]]:
+    """
+    Runs up to `trials` trials of one (p, n) config and returns the test counts of every
+    algorithm; each algorithm may stop early (see `_mean_has_converged`).
+    This is the unit of work handed to the worker processes, so it only takes
+    picklable arguments and seeds its own RNG.
+    """
+    p, i, n, trials, seed = args
+    all_mods = list(range(n))
+    trial_counts: Dict[str, List[int]] = {name: [] for name in ALGORITHMS}
+    if len(all_mods) < p:
+        return p, i, trial_counts
+
+    # Draw every trial's problematic set up front: the p smallest of n random scores
+    # per row are p distinct mods, chosen uniformly and without replacement.
+    rng = np.random.default_rng(seed)
+    problematic_sets = np.argpartition(rng.random((trials, n)), p - 1, axis=1)[:, :p]
+
+    active = dict(ALGORITHMS)
+    running_sums = {name: [0, 0] for name in ALGORITHMS}
+
+    # The algorithms are deterministic functions of the oracle's answers, so all
+    # trials that draw the same problematic set share one test trace. Run each
+    # distinct set once and reuse its counts (this collapses most trials for small n).
+    # Algorithms only ever drop out, so a memoized entry covers every active one.
+    counts_by_problem: Dict[Mask, Dict[str, int]] = {}
+    for row in problematic_sets.tolist():
+        if not active:
+            break
+        problematic_set = _to_mask(row)
+        counts = counts_by_problem.get(problematic_set)
+        if counts is None:
+            # All algorithms face the same problematic set in a trial, so they share one
+            # cache; test_count is still per algorithm.
+            shared_cache: Dict[Mask, bool] = {}
+            counts = {}
+            for name, func in active.items():
+                oracle = TestRunner(problematic_set, shared_cache=shared_cache)
+                found = func(oracle, all_mods)
+                if found != problematic_set:
+                    raise ValueError(f"VALIDATION FAILED: {name} for n={n}, p={p}, Expected: {_mask_to_list(problematic_set)}, Got: {_mask_to_list(found)}")
+                counts[name] = oracle.test_count
+            counts_by_problem[problematic_set] = counts
+        for name in list(active):
+            test_count = counts[name]
+            trial_counts[name].append(test_count)
+            sums = running_sums[name]
+            sums[0] += test_count
+            sums[1] += test_count * test_count
+            if _mean_has_converged(len(trial_counts[name]), sums[0], sums[1]):
+                del active[name]
+    return p, i, trial_counts
 
+def run_benchmark_and_plot():
     N_VALUES = sorted(list(set([5, 10, 25, 50, 75, 100, 150, 200, 250, 300, 400, 500])))
     P_MAX = 5
     TRIALS_PER_CONFIG = 500
 
-    algorithms = {
-        "Original Additive": find_conflicts_additive,
-        "Smart Additive": find_conflicts_smart_additive,
-        "ddmin Subtractive": find_conflicts_subtractive_ddmin,
-        "QuickXplain": find_conflicts_qxp,
-        "Adaptive Hybrid": find_conflicts_adaptive
-    }
+    algorithms = ALGORITHMS
     
     results = {p: {
         'n': N_VALUES,
         **{name: {'all_trials': [[] for _ in N_VALUES]} for name in algorithms}
     } for p in range(1, P_MAX + 1)}
 
-    print("--- Starting Benchmark ---")
-    total_configs = len(range(1, P_MAX + 1)) * len(N_VALUES)
-    current_config = 0
-    
-    for p in range(1, P_MAX + 1):
-        for i, n in enumerate(N_VALUES):
-            current_config += 1
-            print(f"  Running config {current_config}/{total_configs} (p={p}, n={n})...", end="\r", flush=True)
-            for name, func in algorithms.items():
-                trial_counts_for_alg = []
-                for _ in range(TRIALS_PER_CONFIG):
-                    all_mods = list(range(n))
-                    if len(all_mods) < p: continue
-                    problematic_set = set(random.sample(all_mods, k=p))
-                    oracle = TestRunner(problematic_set)
-                    found = func(oracle, all_mods)
-                    trial_counts_for_alg.append(oracle.test_count)
-                    if found != problematic_set:
-                        raise ValueError(f"VALIDATION FAILED: {name} for n={n}, p={p}, Expected: {problematic_set}, Got: {found}")
+    # Every (p, n) config is independent, so they are fanned out over all cores.
+    # Each config has a fixed seed, so repeated runs are comparable.
+    tasks = [(p, i, n, TRIALS_PER_CONFIG, p * 10000 + n)
+             for p in range(1, P_MAX + 1)
+             for i, n in enumerate(N_VALUES)]
+
+    print(f"--- Starting Benchmark ({os.cpu_count()} processes) ---")
+    with Pool(processes=os.cpu_count()) as pool:
+        for done, (p, i, trial_counts) in enumerate(pool.imap_unordered(_run_config, tasks), start=1):
+            print(f"  Finished config {done}/{len(tasks)}...", end="\r", flush=True)
+            for name, trial_counts_for_alg in trial_counts.items():
                 results[p][name]['all_trials'][i] = trial_counts_for_alg
 
     print("\n\n--- Benchmark Complete ---")
 
-    print("\n--- Test Counts Summary (min / median / max / avg) ---")
+    print("\n--- Test Counts Summary (min / median / max / avg [trials]) ---")
+    print(f"Each cell stops sampling once its mean has converged (at least {EARLY_STOP_MIN_TRIALS}, at most {TRIALS_PER_CONFIG} trials),")
+    print("so cells come from different numbers of trials, and min / max only cover the trials that actually ran.")
     def get_stats_str(counts):
         if not counts: return "N/A"
         s_min, s_med, s_max, s_avg = min(counts), statistics.median(counts), max(counts), statistics.mean(counts)
-        return f"{s_min:<4} / {s_med:<5.0f} / {s_max:<5} / {s_avg:<6.1f}"
+        return f"{s_min:<4} / {s_med:<5.0f} / {s_max:<5} / {s_avg:<6.1f} [{len(counts)}]"
 
-    col_width = 33
+    col_width = 39
     header = f"{'p':<2} | {'n':<4} || " + " | ".join([f"{name:<{col_width}}" for name in algorithms])
     print(header)
     print("-" * len(header))
@@ -344,6 +512,25 @@ def run_benchmark_and_plot():
         if p < P_MAX: print("-" * len(header))
 
     # --- Plotting ---
+    # Matplotlib is imported lazily so the worker processes and headless runs never pay for it.
+    try:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        import matplotlib.ticker as mticker
+    except ImportError:
+        print("\nMatplotlib not found. Cannot generate plots.")
+        return
+
+    # The trend-fit inputs only depend on N_VALUES, so they are computed once for all curves.
+    N_ARRAY = np.array(N_VALUES)
+    LOG_N = np.log(N_ARRAY)
+    N_SMOOTH = np.linspace(N_VALUES[0], N_VALUES[-1], 200)
+    LOG_N_SMOOTH = np.log(N_SMOOTH)
+
+    # Plots go next to this script rather than into whatever directory it was started from.
+    output_dir = os.path.dirname(os.path.abspath(__file__))
+    print(f"\nSaving plots to {output_dir}...")
     for p in range(1, P_MAX + 1):
         fig, ax = plt.subplots(figsize=(14, 8))
         colors = {"Original Additive": "orange", "ddmin Subtractive": "red", "Smart Additive": "green", "Smart Additive Opt": "lime", "QuickXplain": "blue", "Adaptive Hybrid": "purple"}
@@ -366,18 +553,25 @@ def run_benchmark_and_plot():
                        whiskerprops=dict(color='black', linewidth=1.5), capprops=dict(color='black', linewidth=1.5),
                        showfliers=False, zorder=5)
             
-            avg_data = [statistics.mean(trials) if trials else 0 for trials in all_trials_for_alg]
+            # Pad the per-n trial lists into one 2-D array so all averages are a single reduction.
+            trial_lengths = np.array([len(trials) for trials in all_trials_for_alg])
+            padded_trials = np.zeros((len(N_VALUES), max(trial_lengths.max(), 1)))
+            for row, trials in enumerate(all_trials_for_alg):
+                padded_trials[row, :len(trials)] = trials
+            avg_data = padded_trials.sum(axis=1) / np.maximum(trial_lengths, 1)
             ax.plot(positions, avg_data, color=colors[name], lw=2.5, marker='x', markeredgecolor='black',
                     markersize=7, label=f'{name} (Avg)', zorder=10)
             
-            if np:
-                valid_indices = [idx for idx, data in enumerate(avg_data) if data > 0]
-                if len(valid_indices) > 1:
-                    n_fit, avg_fit = np.array(N_VALUES)[valid_indices], np.array(avg_data)[valid_indices]
-                    coeffs = np.polyfit(np.log(n_fit), avg_fit, 1)
-                    n_smooth = np.linspace(n_fit[0], n_fit[-1], 200)
-                    trend_line = coeffs[0] * np.log(n_smooth) + coeffs[1]
-                    ax.plot(n_smooth, trend_line, '--', color=colors[name], lw=1.2, alpha=1.0, zorder=8, label=f'{name} (Trend)')
+            valid_indices = np.flatnonzero(avg_data > 0)
+            if len(valid_indices) > 1:
+                coeffs = np.polyfit(LOG_N[valid_indices], avg_data[valid_indices], 1)
+                if len(valid_indices) == len(N_VALUES):
+                    n_smooth, log_n_smooth = N_SMOOTH, LOG_N_SMOOTH
+                else:
+                    n_smooth = np.linspace(N_ARRAY[valid_indices[0]], N_ARRAY[valid_indices[-1]], 200)
+                    log_n_smooth = np.log(n_smooth)
+                trend_line = coeffs[0] * log_n_smooth + coeffs[1]
+                ax.plot(n_smooth, trend_line, '--', color=colors[name], lw=1.2, alpha=1.0, zorder=8, label=f'{name} (Trend)')
 
         ax.set_title(f'Algorithm Performance for p = {p} Problematic Mods', fontsize=16)
         ax.set_xlabel('n (Total Number of Mods)', fontsize=12)
@@ -397,9 +591,11 @@ def run_benchmark_and_plot():
         ax.set_xticklabels(N_VALUES, rotation=45, ha="right")
         ax.tick_params(axis='x', which='minor', bottom=False)
         fig.tight_layout()
-    
-    print("\nDisplaying plots...")
-    plt.show()
+
+        file_name = f"algorithm-performance-p-{p}.png"
+        fig.savefig(os.path.join(output_dir, file_name), dpi=110)
+        plt.close(fig)
+        print(f"  Saved {file_name}")
                     
 if __name__ == "__main__":
     run_benchmark_and_plot()
\ No newline at end of file
@@ -1,9 +1,27 @@
-import random
-import statistics
-from typing import Set, List, Optional, Callable, Tuple
-import matplotlib.pyplot as plt
-import matplotlib.ticker as mticker
+import os
+from typing import Dict, Set, List, Optional, Callable, Iterator, Tuple, Union
+from multiprocessing import Pool
 import itertools
+import operator
+import numpy as np
+
+# ==============================================================================
+# 0. Component Sets as Bitmasks
+# ==============================================================================
+# The algorithm works on component sets encoded as ints: component i of the sorted
+# component list is bit i, so union is `|`, removal is `& ~` and subset is `a & b == a`.
+Mask = int
+# Components only need to be sortable and hashable: mod ids in the tool, plain ints in the benchmark.
+Component = Union[str, int]
+
+def _bits_of(mask: Mask) -> List[Mask]:
+    """Splits a mask into its single-bit masks, lowest (= first sorted component) first."""
+    bits = []
+    while mask:
+        low_bit = mask & -mask
+        bits.append(low_bit)
+        mask ^= low_bit
+    return bits
 
 # ==============================================================================
 # 1. Core Component (Oracle)
@@ -11,135 +29,179 @@ import itertools
 
 class TestRunner:
     """A test oracle that knows multiple, independent conflict sets."""
-    def __init__(self, problematic_sets: List[Set[str]]):
-        self.problematic_sets = problematic_sets
+    def __init__(self, problematic_sets: List[Mask]):
+        # Smallest conflicts first: they are the likeliest to be contained in a test set,
+        # so a FAIL short-circuits the loop below sooner.
+        self.problematic_sets = sorted(problematic_sets, key=int.bit_count)
         self.real_test_count = 0
 
-    def run_real_test(self, test_set: Set[str]) -> bool:
+    def run_real_test(self, test_set: Mask) -> bool:
         """Performs the expensive system test. Returns True (FAIL) or False (GOOD)."""
         self.real_test_count += 1
         for conflict in self.problematic_sets:
-            if conflict.issubset(test_set):
+            if conflict & test_set == conflict:
                 return True # FAIL
         return False # GOOD
 
 # The KnowledgeBase class has been removed.
 
 # ==============================================================================
-# 2. The Core IMCS Algorithm (Unchanged)
+# 2. The Core IMCS Algorithm
 # ==============================================================================
 
 def _find_next_conflict_element_optimized(
-    test_func: Callable[[Set[str]], bool],
-    background: Set[str],
-    candidates: List[str]
-) -> Optional[str]:
-    """The optimized recursive helper, now using a generic test function."""
-    candidates_list = sorted(list(candidates)) 
-    if not candidates_list: return None
-    if len(candidates_list) == 1:
-        c = candidates_list[0]
-        return c if test_func(background.union({c})) else None
-
-    mid = len(candidates_list) // 2
-    c1, c2 = set(candidates_list[:mid]), set(candidates_list[mid:])
-
-    if test_func(background.union(c1)):
-        return list(c1)[0] if len(c1) == 1 else _find_next_conflict_element_optimized(test_func, background, list(c1))
-    else:
-        new_background = background.union(c1)
-        if len(c2) == 1:
-            d = list(c2)[0]
-            return d if test_func(new_background.union({d})) else None
+    test_func: Callable[[Mask], bool],
+    background: Mask,
+    prefix: List[Mask],
+    lo: int,
+    hi: int
+) -> Optional[int]:
+    """
+    The optimized divide-and-conquer helper, now using a generic test function.
+    The candidates are the range [lo, hi) of the sorted candidates, whose prefix-OR
+    table `prefix` gives any range as `prefix[hi] ^ prefix[lo]`. Returns the index of the element.
+    Both branches only ever continue with one half, so the search is a loop rather than recursion.
+    """
+    while True:
+        if lo >= hi: return None
+        if hi - lo == 1:
+            return lo if test_func(background | (prefix[hi] ^ prefix[lo])) else None
+
+        mid = lo + (hi - lo) // 2
+        c1 = prefix[mid] ^ prefix[lo]
+
+        if test_func(background | c1):
+            if mid - lo == 1: return lo
+            hi = mid
         else:
-            return _find_next_conflict_element_optimized(test_func, new_background, list(c2))
+            background |= c1
+            if hi - mid == 1:
+                return mid if test_func(background | (prefix[hi] ^ prefix[mid])) else None
+            lo = mid
 
 def find_single_conflict_set(
-    test_func: Callable[[Set[str]], bool],
-    all_components: List[str]
-) -> Set[str]:
+    test_func: Callable[[Mask], bool],
+    candidates: Mask
+) -> Mask:
     """The main IMCS procedure, adapted to find one conflict set using a generic test function."""
-    conflict_set: Set[str] = set()
-    candidates: List[str] = sorted(all_components)
+    conflict_set: Mask = 0
+    # Sorted once: prefix[k] is the mask of the first k candidates.
+    prefix = list(itertools.accumulate(_bits_of(candidates), operator.or_, initial=0))
     while True:
-        next_element = _find_next_conflict_element_optimized(test_func, conflict_set, candidates)
-        if next_element is None: break
+        index = _find_next_conflict_element_optimized(test_func, conflict_set, prefix, 0, len(prefix) - 1)
+        if index is None: break
         
-        conflict_set.add(next_element)
-        candidates.remove(next_element)
+        next_element = prefix[index + 1] ^ prefix[index]
+        conflict_set |= next_element
         
         if test_func(conflict_set): break
+
+        # Remove the element: later prefixes just lose its bit.
+        prefix[index + 1:] = [m ^ next_element for m in prefix[index + 2:]]
     return conflict_set
 
 # ==============================================================================
 # 3. The IMCS-Enumerator Meta-Procedure (Corrected)
 # ==============================================================================
 
-def find_all_conflict_sets_enumerator(all_components: List[str], initial_problematic_sets: List[Set[str]]) -> Tuple[List[Set[str]], int]:
-    """The IMCS-Enum meta-procedure. It is robust against context-dependent test results."""
-    all_conflict_sets: List[Set[str]] = []
-    candidates = set(all_components)
-    total_real_tests = 0
+def find_all_conflict_sets_enumerator(
+    all_components: List[Component],
+    initial_problematic_sets: List[Set[Component]],
+    max_conflicts: Optional[int] = None
+) -> Tuple[List[Set[Component]], int]:
+    """
+    The IMCS-Enum meta-procedure. It is robust against context-dependent test results.
+    If an upper bound on the number of conflicts is known (`max_conflicts`), the search stops
+    once that many were found instead of spending one last probe to confirm the rest is clean.
+    """
+    # Encode the components as bits once; the search itself only sees masks.
+    components = sorted(all_components)
+    bit_of = {component: 1 << i for i, component in enumerate(components)}
+    problematic_masks = [sum(bit_of[c] for c in conflict) for conflict in initial_problematic_sets]
+
+    all_conflict_sets: List[Set[Component]] = []
+    candidates: Mask = (1 << len(components)) - 1
+
+    # One oracle serves every search. It keeps no cache, so each search still sees only real
+    # tests; building it once just saves re-sorting the conflicts per search.
+    oracle = TestRunner(problematic_masks)
 
     while True:
-        if not candidates:
+        if not candidates or (max_conflicts is not None and len(all_conflict_sets) >= max_conflicts):
+            break
+
+        # After a conflict was removed the rest may be clean. One probe settles that; otherwise the
+        # search would bisect its way to "nothing here". The first search needs no probe, since
+        # it covers the empty case itself by returning nothing.
+        if all_conflict_sets and not oracle.run_real_test(candidates):
             break
-            
-        # For each new search, we must use a fresh test oracle context.
-        # This models the user focusing on a new problem.
-        # The oracle knows all problems, but the test counts are isolated per run.
-        oracle_for_this_run = TestRunner(initial_problematic_sets)
         
         # Run IMCS on the remaining candidates.
         # We pass the oracle's real test method directly, ensuring no caching between runs.
-        new_conflict_set = find_single_conflict_set(oracle_for_this_run.run_real_test, list(candidates))
-        
-        # Add the tests performed in this run to our total.
-        total_real_tests += oracle_for_this_run.real_test_count
+        new_conflict_set = find_single_conflict_set(oracle.run_real_test, candidates)
         
         if not new_conflict_set:
             break # No more conflicts found.
         
-        all_conflict_sets.append(new_conflict_set)
-        candidates -= new_conflict_set # Remove found elements from the next search.
+        all_conflict_sets.append({components[bit.bit_length() - 1] for bit in _bits_of(new_conflict_set)})
+        candidates &= ~new_conflict_set # Remove found elements from the next search.
             
-    return all_conflict_sets, total_real_tests
+    return all_conflict_sets, oracle.real_test_count
 
 # ==============================================================================
 # 4. Benchmarking and Plotting Harness (Updated to call corrected enumerator)
 # ==============================================================================
 
-def generate_disjoint_sets(pool: List[str], sizes: List[int]) -> List[Set[str]]:
+def generate_disjoint_sets(pool: List[int], sizes: List[int], rng: np.random.Generator) -> List[Set[int]]:
     """Safely generates multiple disjoint sets of specified sizes from a pool."""
-    available = list(pool)
-    random.shuffle(available)
-    result_sets = []
-    
     total_needed = sum(sizes)
-    if total_needed > len(available):
-        raise ValueError(f"Not enough items in pool (len={len(available)}) to generate disjoint sets of total size {total_needed}.")
+    if total_needed > len(pool):
+        raise ValueError(f"Not enough items in pool (len={len(pool)}) to generate disjoint sets of total size {total_needed}.")
+
+    # One C-level shuffle of the indices; the first `total_needed` are the draw.
+    chosen = rng.permutation(len(pool))[:total_needed].tolist()
+    result_sets = []
         
     start_index = 0
     for size in sizes:
         end_index = start_index + size
-        result_sets.append(set(available[start_index:end_index]))
+        result_sets.append({pool[i] for i in chosen[start_index:end_index]})
         start_index = end_index
         
     return result_sets
 
-def generate_all_cartesian_products(max_p: int, num_sets: int) -> List[List[int]]:
-    """Generates all combinations of conflict set sizes for N independent sets."""
+def generate_all_cartesian_products(max_p: int, num_sets: int) -> Iterator[Tuple[int, ...]]:
+    """Lazily generates all combinations of conflict set sizes for N independent sets."""
     sizes_range = range(1, max_p + 1)
-    return list(itertools.product(sizes_range, repeat=num_sets))
+    return itertools.product(sizes_range, repeat=num_sets)
 
-def run_enumerator_benchmark():
-    if not plt:
-        print("Matplotlib not found, cannot generate plots.")
-        return
+def _one_trial(args: Tuple[List[int], Tuple[int, ...], int, Optional[int]]) -> int:
+    """
+    Runs one enumerator trial on `N` components against freshly drawn conflicts of the given
+    sizes and returns its real test count. Top-level so a Pool can run it; the seed fixes the
+    draw, so results don't depend on which worker ran the trial.
+    """
+    conflict_sizes, seed, N, max_conflicts = args
+    # Components are the ints 0..N-1 rather than names: cheaper to hash, and each is its own bit index.
+    all_components = list(range(N))
+    expected_sets = generate_disjoint_sets(all_components, conflict_sizes, np.random.default_rng(seed))
+
+    found_sets, real_test_count = find_all_conflict_sets_enumerator(all_components, expected_sets, max_conflicts)
+
+    # Compare the conflicts as sorted masks, which needs no frozenset per conflict.
+    def as_sorted_masks(conflict_sets: List[Set[int]]) -> List[Mask]:
+        return sorted(sum(1 << c for c in conflict) for conflict in conflict_sets)
 
+    if as_sorted_masks(found_sets) != as_sorted_masks(expected_sets):
+        raise RuntimeError(f"Validation failed for conflict sizes {conflict_sizes} (seed {seed})!")
+    return real_test_count
+
+def run_enumerator_benchmark():
     N = 128
     TRIALS_PER_CONFIG = 1000
-    all_components = [f"mod_{i:03}" for i in range(N)]
+    # Tell the enumerator how many conflicts there are. The real tool can't know this, so it is
+    # off by default; turning it on drops the final "nothing left" probe from every trial.
+    USE_CONFLICT_COUNT_HINT = False
 
     grouped_test_cases: dict[str, dict[str, List[int]]] = {
         "1 Independent Conflict": {},
@@ -168,38 +230,41 @@ def run_enumerator_benchmark():
 
     print(f"--- Starting IMCS-Enumerator Benchmark (n={N}, trials={TRIALS_PER_CONFIG}) ---")
 
-    for group_name, cases_in_group_sorted in sorted_test_case_keys_in_groups.items():
-        print(f"\nProcessing Group: {group_name}")
-        for case_name in cases_in_group_sorted:
-            conflict_sizes = grouped_test_cases[group_name][case_name]
-            print(f"  Running case: {case_name} (total {sum(conflict_sizes)} mods)...")
-            
-            if sum(conflict_sizes) > N:
-                print(f"    Skipping: Total problematic mods ({sum(conflict_sizes)}) exceeds N ({N}).")
-                full_results_data[group_name][case_name] = []
-                continue
-
-            test_counts = []
-            for _ in range(TRIALS_PER_CONFIG):
-                expected_sets = generate_disjoint_sets(all_components, conflict_sizes)
-                
-                # Call the corrected enumerator
-                found_sets, real_test_count = find_all_conflict_sets_enumerator(all_components, expected_sets)
-                
-                if len(found_sets) != len(expected_sets) or set(map(frozenset, found_sets)) != set(map(frozenset, expected_sets)):
-                    raise RuntimeError(f"Validation failed for case {case_name}!")
-
-                test_counts.append(real_test_count)
-            full_results_data[group_name][case_name] = test_counts
+    # Trials are independent, so spread each case's trials over all cores. Every trial gets its
+    # own seed (group, case, trial), which keeps runs reproducible regardless of scheduling.
+    with Pool(processes=os.cpu_count()) as pool:
+        for group_index, (group_name, cases_in_group_sorted) in enumerate(sorted_test_case_keys_in_groups.items()):
+            print(f"\nProcessing Group: {group_name}")
+            for case_index, case_name in enumerate(cases_in_group_sorted):
+                conflict_sizes = grouped_test_cases[group_name][case_name]
+                print(f"  Running case: {case_name} (total {sum(conflict_sizes)} mods)...")
+
+                if sum(conflict_sizes) > N:
+                    print(f"    Skipping: Total problematic mods ({sum(conflict_sizes)}) exceeds N ({N}).")
+                    full_results_data[group_name][case_name] = []
+                    continue
+
+                max_conflicts = len(conflict_sizes) if USE_CONFLICT_COUNT_HINT else None
+                tasks = [(conflict_sizes, (group_index, case_index, trial), N, max_conflicts)
+                         for trial in range(TRIALS_PER_CONFIG)]
+                full_results_data[group_name][case_name] = list(pool.imap_unordered(_one_trial, tasks, chunksize=32))
 
     print("\n--- Benchmark Complete ---")
 
-    # The rest of the script (printing and plotting) is unchanged and will work correctly.
+    # Reduce every case to its summary numbers once; printing and plotting only read these.
+    case_total_mods: Dict[Tuple[str, str], int] = {}
+    case_stats: Dict[Tuple[str, str], Tuple[int, float, int, float]] = {}
+    for group_name, cases_in_group in grouped_test_cases.items():
+        for case_name, conflict_sizes in cases_in_group.items():
+            case_total_mods[group_name, case_name] = sum(conflict_sizes)
+            counts = full_results_data[group_name][case_name]
+            if counts:
+                counts_arr = np.asarray(counts)
+                case_stats[group_name, case_name] = (int(counts_arr.min()), float(np.median(counts_arr)),
+                                                     int(counts_arr.max()), float(counts_arr.mean()))
 
     print("\n--- IMCS-Enumerator Test Counts Summary (min / median / max / avg) ---")
-    max_case_label_len = max(len(f"{cn} (Total={sum(grouped_test_cases[gn][cn])})") 
-                             for gn, group_cases in grouped_test_cases.items() 
-                             for cn in group_cases)
+    max_case_label_len = max(len(f"{cn} (Total={total_mods})") for (_, cn), total_mods in case_total_mods.items())
     
     header_cols = [f"Conflict Case (Total=X):<{max(max_case_label_len, 25)}", "min", "median", "max", "avg"]
     header_line = " | ".join([f"{col:<{max(len(col), 5) if col != header_cols[0] else max_case_label_len}}" for col in header_cols])
@@ -209,16 +274,23 @@ def run_enumerator_benchmark():
     for group_name in grouped_test_cases.keys():
         print(f"\n{group_name}:")
         for case_name in sorted_test_case_keys_in_groups[group_name]:
-            counts = full_results_data[group_name][case_name]
-            total_mods_in_case = sum(grouped_test_cases[group_name][case_name])
-            case_label = f"{case_name} (Total={total_mods_in_case})"
+            case_label = f"{case_name} (Total={case_total_mods[group_name, case_name]})"
 
-            if not counts:
+            if (group_name, case_name) not in case_stats:
                 print(f"{case_label:<{max_case_label_len}} | {'N/A':<5} | {'N/A':<7} | {'N/A':<5} | {'N/A':<6}")
                 continue
 
-            s_min, s_med, s_max, s_avg = min(counts), statistics.median(counts), max(counts), statistics.mean(counts)
+            s_min, s_med, s_max, s_avg = case_stats[group_name, case_name]
             print(f"{case_label:<{max_case_label_len}} | {s_min:<5} | {s_med:<7.0f} | {s_max:<5} | {s_avg:<6.1f}")
+
+    # Matplotlib is imported lazily so the worker processes, which re-import this module
+    # when they are spawned, never pay for it.
+    try:
+        import matplotlib.pyplot as plt
+        import matplotlib.ticker as mticker
+    except ImportError:
+        print("\nMatplotlib not found. Cannot generate plots.")
+        return
         
     fig, ax = plt.subplots(figsize=(18, 9))
     global_min_y, global_max_y = float('inf'), 0
@@ -234,29 +306,30 @@ def run_enumerator_benchmark():
             if group_name not in x_positions_by_group: x_positions_by_group[group_name] = []
             x_positions_by_group[group_name].append(case_x_pos)
             all_x_labels.append(case_name)
-            conflict_sizes, total_mods = cases_in_group[case_name], sum(cases_in_group[case_name])
+            total_mods = case_total_mods[group_name, case_name]
             if total_mods not in all_total_mod_groups: all_total_mod_groups[total_mods] = []
-            if full_results_data[group_name][case_name]:
-                avg_val = statistics.mean(full_results_data[group_name][case_name])
+            if (group_name, case_name) in case_stats:
+                avg_val = case_stats[group_name, case_name][3]
                 all_total_mod_groups[total_mods].append((case_x_pos, avg_val))
         current_x += len(sorted_case_names) + group_spacing
 
     line_colors = ['red', 'blue', 'green']
     for group_idx, (group_name, cases_in_group) in enumerate(grouped_test_cases.items()):
-        plot_data_for_group, actual_x_positions = [], []
+        plot_data_for_group, plot_stats_for_group, actual_x_positions = [], [], []
         for i, case_name in enumerate(sorted(cases_in_group.keys())):
-            if full_results_data[group_name][case_name]:
+            if (group_name, case_name) in case_stats:
                 plot_data_for_group.append(full_results_data[group_name][case_name])
+                plot_stats_for_group.append(case_stats[group_name, case_name])
                 actual_x_positions.append(x_positions_by_group[group_name][i])
         if not plot_data_for_group: continue
-        for counts_list in plot_data_for_group:
-             if counts_list: global_min_y, global_max_y = min(global_min_y, min(counts_list)), max(global_max_y, max(counts_list))
+        for s_min, _, s_max, _ in plot_stats_for_group:
+            global_min_y, global_max_y = min(global_min_y, s_min), max(global_max_y, s_max)
         bp = ax.boxplot(plot_data_for_group, positions=actual_x_positions, widths=0.6, patch_artist=True, showfliers=False, zorder=5)
         for patch in bp['boxes']: patch.set_facecolor(plt.get_cmap('Pastel1')(group_idx % plt.get_cmap('Pastel1').N)); patch.set_alpha(0.8)
         for median in bp['medians']: median.set_color('black'); median.set_linewidth(2)
         for whisker in bp['whiskers']: whisker.set_color('black'); whisker.set_linewidth(1.5)
         for cap in bp['caps']: cap.set_color('black'); cap.set_linewidth(1.5)
-        averages = [statistics.mean(d) for d in plot_data_for_group]
+        averages = [s_avg for _, _, _, s_avg in plot_stats_for_group]
         ax.plot(actual_x_positions, averages, 'o-', color=line_colors[group_idx % len(line_colors)], lw=2, markersize=8, label=f'{group_name} Avg')
     
     total_mods_plotted = False